@@ -0,0 +1,187 @@
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+
+# Accounts are grouped into this many packs by a hash of their name, so
+# changing one account only rewrites the pack it falls into.
+BUCKETS = 256
+
+
+class BackupRepository:
+    """Content-addressed, deduplicated backup snapshots of the vault.
+
+    Layout under the repository directory::
+
+        packs/<sha256>    JSON {name: secret} for one bucket of accounts,
+                          or the JSON list of names in vault order
+        snapshots/<id>    header line {"created": ..., "count": ...,
+                          "order": <sha256>}, then one
+                          "<bucket> <pack sha256>" line per bucket
+
+    Snapshot ids are Unix timestamps, so sorting them sorts by time. A new
+    snapshot only writes the packs whose contents changed, plus a manifest
+    of at most BUCKETS short lines; the name order is only rewritten when
+    it changes, and nothing is written if the vault is unchanged.
+
+    Unreadable packs or manifests raise ``ValueError`` (or ``OSError`` if a
+    file is missing); a missing snapshot raises ``KeyError``.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.packs_dir = self.path / "packs"
+        self.snapshots_dir = self.path / "snapshots"
+
+    @staticmethod
+    def _bucket(name):
+        return hashlib.sha256(name.encode("utf-8")).digest()[0] % BUCKETS
+
+    @staticmethod
+    def _write_atomic(path, data):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + ".tmp")
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+
+    def _manifest_path(self, snapshot_id):
+        path = self.snapshots_dir / str(snapshot_id)
+        if not str(snapshot_id).isdigit() or not path.exists():
+            raise KeyError(f"No such snapshot: {snapshot_id}")
+        return path
+
+    def snapshot(self, keys):
+        """Store ``keys`` as a new snapshot.
+
+        Returns ``(snapshot_id, packs_written)``, or ``(None, 0)`` when the
+        vault is unchanged since the latest snapshot.
+        """
+        buckets = {}
+        for name, secret in keys.items():
+            buckets.setdefault(self._bucket(name), {})[name] = secret
+
+        packs = {}
+        pending = []
+        for bucket, entries in buckets.items():
+            packs[bucket] = self._stage(entries, pending)
+        order = self._stage(list(keys), pending)
+
+        ids = self.list_snapshots()
+        if not pending and ids:
+            try:
+                if self.info(ids[-1]).get("order") == order and self.manifest(ids[-1]) == packs:
+                    return None, 0
+            except (OSError, ValueError):
+                pass
+
+        for digest, data in pending:
+            self._write_atomic(self.packs_dir / digest, data)
+
+        snapshot_id = int(time.time())
+        while (self.snapshots_dir / str(snapshot_id)).exists():
+            snapshot_id += 1
+        header = json.dumps({"created": snapshot_id, "count": len(keys), "order": order})
+        lines = "".join(f"{bucket} {digest}\n" for bucket, digest in sorted(packs.items()))
+        # The manifest goes last, so an interrupted run never leaves a
+        # snapshot pointing at missing packs.
+        self._write_atomic(self.snapshots_dir / str(snapshot_id), (header + "\n" + lines).encode("utf-8"))
+        return str(snapshot_id), len(pending)
+
+    def _stage(self, value, pending):
+        """Serialize ``value``, queue it in ``pending`` if not stored yet, return its hash."""
+        data = json.dumps(value, sort_keys=True, ensure_ascii=False).encode("utf-8")
+        digest = hashlib.sha256(data).hexdigest()
+        if not (self.packs_dir / digest).exists():
+            pending.append((digest, data))
+        return digest
+
+    def list_snapshots(self):
+        """Return snapshot ids, oldest first."""
+        if not self.snapshots_dir.exists():
+            return []
+        ids = [p.name for p in self.snapshots_dir.iterdir() if p.name.isdigit()]
+        return sorted(ids, key=int)
+
+    def info(self, snapshot_id):
+        """Return the manifest header (``created``, ``count``) without reading the rest."""
+        with open(self._manifest_path(snapshot_id), "r", encoding="utf-8") as f:
+            header = json.loads(f.readline())
+        if not isinstance(header, dict) or "count" not in header:
+            raise ValueError(f"Snapshot {snapshot_id} has no valid header")
+        return header
+
+    def manifest(self, snapshot_id):
+        """Return ``{bucket: pack sha256}`` for a snapshot."""
+        packs = {}
+        with open(self._manifest_path(snapshot_id), "r", encoding="utf-8") as f:
+            f.readline()
+            for line in f:
+                try:
+                    bucket, digest = line.split()
+                    packs[int(bucket)] = digest
+                except ValueError:
+                    raise ValueError(f"Malformed line in snapshot {snapshot_id}: {line.strip()!r}")
+        return packs
+
+    def _load_pack(self, digest):
+        with open(self.packs_dir / digest, "rb") as f:
+            data = f.read()
+        if hashlib.sha256(data).hexdigest() != digest:
+            raise ValueError(f"Pack {digest} does not match its hash")
+        return json.loads(data.decode("utf-8"))
+
+    def restore(self, snapshot_id):
+        """Return the ``{name: secret}`` vault contents of a snapshot, in vault order."""
+        keys = {}
+        for digest in self.manifest(snapshot_id).values():
+            keys.update(self._load_pack(digest))
+        order = self.info(snapshot_id).get("order")
+        if order is None:
+            return keys
+        names = self._load_pack(order)
+        if not isinstance(names, list) or set(names) != set(keys):
+            raise ValueError(f"Name order of snapshot {snapshot_id} does not match its entries")
+        return {name: keys[name] for name in names}
+
+    def diff(self, old_id, new_id):
+        """Return ``(added, removed, changed)`` account names between two snapshots.
+
+        Only packs whose hashes differ are read.
+        """
+        old = self.manifest(old_id)
+        new = self.manifest(new_id)
+        added, removed, changed = [], [], []
+        for bucket in set(old) | set(new):
+            if old.get(bucket) == new.get(bucket):
+                continue
+            before = self._load_pack(old[bucket]) if bucket in old else {}
+            after = self._load_pack(new[bucket]) if bucket in new else {}
+            added.extend(name for name in after if name not in before)
+            removed.extend(name for name in before if name not in after)
+            changed.extend(name for name in after if name in before and after[name] != before[name])
+        return sorted(added), sorted(removed), sorted(changed)
+
+    def prune(self, keep):
+        """Keep the newest ``keep`` snapshots; return ``(snapshots_removed, packs_removed)``."""
+        ids = self.list_snapshots()
+        doomed = ids[:-keep] if keep > 0 else ids
+        for snapshot_id in doomed:
+            (self.snapshots_dir / snapshot_id).unlink()
+        return len(doomed), self.gc()
+
+    def gc(self):
+        """Delete packs no snapshot refers to; return how many were removed."""
+        if not self.packs_dir.exists():
+            return 0
+        live = set()
+        for snapshot_id in self.list_snapshots():
+            live.update(self.manifest(snapshot_id).values())
+            live.add(self.info(snapshot_id).get("order"))
+        removed = 0
+        for pack in self.packs_dir.iterdir():
+            if pack.name not in live:
+                pack.unlink()
+                removed += 1
+        return removed
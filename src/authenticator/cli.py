@@ -1,18 +1,38 @@
 import click
 import time
-import questionary
 import urllib.parse
 import os
 import authenticator
-import authenticator.core
-from rich.console import Console
-from rich.panel import Panel
-from rich.live import Live
-from rich.table import Table
 from authenticator.storage import Storage
-from authenticator.sync import wireless_sync, wireless_receiver
 
-console = Console()
+# rich, questionary, pyotp and the sync module are imported inside the commands
+# that need them, so shell completion can answer without loading them.
+
+
+class _LazyConsole:
+    """Create the rich console on first use."""
+
+    _console = None
+
+    def __getattr__(self, name):
+        if _LazyConsole._console is None:
+            from rich.console import Console
+
+            _LazyConsole._console = Console()
+        return getattr(_LazyConsole._console, name)
+
+
+console = _LazyConsole()
+
+
+def complete_account_name(ctx, param, incomplete):
+    """Shell completion for stored account names, served from the name index."""
+    try:
+        names = Storage().list_names()
+    except Exception:
+        return []
+    return [name for name in names if name.startswith(incomplete)]
+
 
 ASCII_ART = """  ______               __      __                                                  __                         
  /      \             /  |    /  |                                                /  |                        
@@ -46,11 +66,26 @@ def version():
 
 # TOTP display with countdown
 @cli.command()
-@click.argument("secret")
+@click.argument("secret", required=False)
 @click.option("--refresh", default=4.0, show_default=True, type=float, help="Refresh rate per second")
 @click.option("--no-color", is_flag=True, help="Disable colored output")
 @click.option("--once", is_flag=True, help="Print once and exit")
-def now(secret, refresh, no_color, once):
+@click.option("--stdin", "from_stdin", is_flag=True, help="Read secrets or otpauth:// URIs from stdin, one per line")
+@click.option("--format", type=click.Choice(["plain", "ndjson"]), default="plain", show_default=True, help="Output format for --stdin")
+def now(secret, refresh, no_color, once, from_stdin, format):
+    import authenticator.core
+
+    if from_stdin:
+        if secret:
+            raise click.UsageError("SECRET cannot be combined with --stdin.")
+        _now_stream(format)
+        return
+    if not secret:
+        raise click.UsageError("Missing argument 'SECRET' (or use --stdin).")
+
+    from rich.panel import Panel
+    from rich.live import Live
+
     # Clean secret (remove whitespace and common accidental characters)
     secret = secret.strip().upper()
     
@@ -93,10 +128,61 @@ def now(secret, refresh, no_color, once):
         except KeyboardInterrupt:
             console.print("\nExiting...")
 
+def _now_stream(format):
+    """Pipe mode for `auth now --stdin`: plain text out, no rich rendering.
+
+    Plain output has exactly one line per input line: the code, or an empty
+    line for blank and invalid input (invalid lines are also reported on
+    stderr). NDJSON output skips blank lines; each object carries its line.
+    """
+    import json
+    import sys
+    import authenticator.core
+
+    out = sys.stdout
+    failed = 0
+    batches = authenticator.core.iter_line_batches(sys.stdin.buffer)
+    for batch in authenticator.core.iter_code_batches(batches):
+        lines = []
+        for result in batch:
+            if "error" in result:
+                failed += 1
+                if format == "plain":
+                    sys.stderr.write(f"line {result['line']}: {result['error']}\n")
+            if format == "ndjson":
+                if len(result) > 1:
+                    lines.append(json.dumps(result, ensure_ascii=False) + "\n")
+            else:
+                lines.append(result.get("code", "") + "\n")
+        out.write("".join(lines))
+        out.flush()
+    if failed:
+        sys.exit(1)
+
+# Current code for a stored account
+@cli.command()
+@click.argument("name", shell_complete=complete_account_name)
+def code(name):
+    """Show the current code for a stored account."""
+    import authenticator.core
+    from rich.panel import Panel
+
+    secret = Storage().list_keys().get(name)
+    if secret is None:
+        console.print(f"[red]No stored secret named {name}[/red]")
+        return
+
+    gen = authenticator.core.TOTPGenerator(secret)
+    console.print(Panel(f"[bold green]{gen.now()}[/bold green]\n[green]Valid for {gen.remaining()} seconds[/green]", title=name, border_style="green"))
+
 # Settings menu
 @cli.command()
 def settings():
     """Manage stored secrets (add/rename/delete/list)."""
+    import authenticator.core
+    import questionary
+    from rich.table import Table
+
     storage = Storage()
 
     while True:
@@ -265,25 +351,26 @@ def panel():
 @click.option("--format", type=click.Choice(["table", "json", "plain"]), default="table", help="Output your key")
 def output(format):
     """Export all stored keys."""
+    from rich.table import Table
+
     storage = Storage()
-    keys = storage.list_keys()
+    accounts = storage.load_table()
     
-    if not keys:
+    if not accounts:
         console.print("[yellow]No stored secrets[/yellow]")
         return
 
     if format == "json":
-        import json
-        console.print_json(data=keys)
+        console.print_json(data=dict(accounts.items()))
     elif format == "plain":
-        for name, secret in keys.items():
+        for name, secret in accounts.items():
             console.print(f"{name}: {secret}")
     else:
         table = Table(title="Exported Secrets", border_style="bold magenta")
         table.add_column("Account Name", style="cyan bold")
         table.add_column("Secret Key", style="yellow")
         
-        for name, secret in keys.items():
+        for name, secret in accounts.items():
             table.add_row(name, secret)
         console.print(table)
 
@@ -292,8 +379,16 @@ def output(format):
 @click.option("--output", "-o", type=click.Path(), help="Output file path for file sync (e.g. sync.json)")
 @click.option("--role", type=click.Choice(["sender", "receiver"]), help="Wireless mode: sender or receiver")
 @click.option("--port", type=int, default=9999, show_default=True, help="Port for wireless sync")
-def sync(way, output, role, port):
+@click.option("--repo", type=click.Path(file_okay=False), help="File sync: add a deduplicated snapshot to this backup repository instead of writing a full copy")
+def sync(way, output, role, port, repo):
     import json
+    import questionary
+    from authenticator.sync import wireless_sync, wireless_receiver
+
+    if repo and way != "file":
+        raise click.UsageError("--repo can only be used with --way file.")
+    if repo and output:
+        raise click.UsageError("--repo and --output cannot be combined.")
 
     storage = Storage()
 
@@ -302,6 +397,22 @@ def sync(way, output, role, port):
         if not keys:
             console.print("[yellow]No stored secrets to sync[/yellow]")
             return
+
+        if repo:
+            from authenticator.backup import BackupRepository
+
+            try:
+                snapshot_id, written = BackupRepository(repo).snapshot(keys)
+                if snapshot_id is None:
+                    console.print("[cyan]No changes since the last snapshot, nothing written[/cyan]")
+                    return
+                console.print(f"[green]✓ Snapshot {snapshot_id} saved to: {repo}[/green]")
+                console.print(f"[cyan]Changed packs written: {written}[/cyan]")
+                console.print(f"[yellow]Total keys: {len(keys)}[/yellow]")
+            except Exception as e:
+                console.print(f"[red]✗ Snapshot failed: {e}[/red]")
+            return
+
         # 生成默认文件名（包含时间戳）
         if not output:
             output = f"authenticator_backup_{int(time.time())}.json"
@@ -360,6 +471,111 @@ def sync(way, output, role, port):
     
 
 
+# Backup repository (snapshots written by `auth sync --way file --repo`)
+@cli.group()
+@click.option("--repo", type=click.Path(file_okay=False), required=True, help="Backup repository directory")
+@click.pass_context
+def backup(ctx, repo):
+    """List, diff, restore and prune backup snapshots."""
+    from authenticator.backup import BackupRepository
+
+    ctx.obj = BackupRepository(repo)
+
+
+@backup.command("list")
+@click.pass_obj
+def backup_list(repo):
+    """List snapshots, oldest first."""
+    from rich.table import Table
+
+    ids = repo.list_snapshots()
+    if not ids:
+        console.print("[yellow]No snapshots[/yellow]")
+        return
+
+    table = Table(title="Backup Snapshots", border_style="cyan")
+    table.add_column("Snapshot", style="cyan bold")
+    table.add_column("Created")
+    table.add_column("Keys", style="yellow")
+    for snapshot_id in ids:
+        try:
+            header = repo.info(snapshot_id)
+        except (OSError, ValueError):
+            table.add_row(snapshot_id, "-", "[red]corrupt[/red]")
+            continue
+        created = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(header["created"]))
+        table.add_row(snapshot_id, created, str(header["count"]))
+    console.print(table)
+
+
+@backup.command("diff")
+@click.argument("old")
+@click.argument("new")
+@click.pass_obj
+def backup_diff(repo, old, new):
+    """Show accounts added, removed or changed between two snapshots."""
+    try:
+        added, removed, changed = repo.diff(old, new)
+    except KeyError as e:
+        console.print(f"[red]✗ {e.args[0]}[/red]")
+        return
+    except (OSError, ValueError) as e:
+        console.print(f"[red]✗ Backup repository is corrupt: {e}[/red]")
+        return
+
+    for name in added:
+        console.print(f"[green]+ {name}[/green]")
+    for name in removed:
+        console.print(f"[red]- {name}[/red]")
+    for name in changed:
+        console.print(f"[yellow]~ {name}[/yellow]")
+    if not (added or removed or changed):
+        console.print("[cyan]No differences[/cyan]")
+
+
+@backup.command("restore")
+@click.argument("snapshot_id")
+@click.option("--output", "-o", type=click.Path(), help="Write the snapshot to a JSON file instead of replacing the stored keys")
+@click.pass_obj
+def backup_restore(repo, snapshot_id, output):
+    """Restore a snapshot into the stored keys (or a JSON file)."""
+    import json
+    import questionary
+
+    try:
+        keys = repo.restore(snapshot_id)
+    except KeyError as e:
+        console.print(f"[red]✗ {e.args[0]}[/red]")
+        return
+    except (OSError, ValueError) as e:
+        console.print(f"[red]✗ Backup repository is corrupt: {e}[/red]")
+        return
+
+    if output:
+        with open(output, "w") as f:
+            json.dump(keys, f, indent=2)
+        console.print(f"[green]✓ Wrote {len(keys)} key(s) to: {output}[/green]")
+        return
+
+    confirm = questionary.confirm(f"Replace all stored keys with snapshot {snapshot_id} ({len(keys)} keys)?", default=False).ask()
+    if confirm:
+        Storage().save(keys)
+        console.print(f"[green]✓ Restored {len(keys)} key(s) from snapshot {snapshot_id}[/green]")
+
+
+@backup.command("prune")
+@click.option("--keep", type=click.IntRange(min=0), required=True, help="Number of newest snapshots to keep")
+@click.pass_obj
+def backup_prune(repo, keep):
+    """Delete old snapshots and garbage-collect unreferenced packs."""
+    try:
+        snapshots, packs = repo.prune(keep)
+    except (OSError, ValueError) as e:
+        console.print(f"[red]✗ Backup repository is corrupt: {e}[/red]")
+        return
+    console.print(f"[green]✓ Removed {snapshots} snapshot(s) and {packs} unreferenced pack(s)[/green]")
+
+
 def main():
     cli()
 
@@ -1,6 +1,12 @@
+import base64
 import pyotp
 import time
+from array import array
+
+
 class TOTPGenerator:
+    __slots__ = ("totp",)
+
     def __init__(self, secret: str):
         self.totp = pyotp.TOTP(secret)
 
@@ -9,4 +15,152 @@ class TOTPGenerator:
 
     def remaining(self) -> int:
         return 30 - (int(time.time()) % 30)
-        
\ No newline at end of file
+
+
+class AccountTable:
+    """Compact view of the stored accounts, in vault order.
+
+    Instead of one str object per name and secret, names are packed into a
+    single UTF-8 blob and secrets into a blob of decoded key bytes, each
+    indexed by an ``array`` of offsets. Secrets that do not round-trip
+    through base32 (lowercase, padded, ...) are kept verbatim, so
+    ``secret()`` always returns exactly what was stored. TOTP generators are
+    only built for the rows that are asked for and dropped again once those
+    rows are no longer in use.
+    """
+
+    __slots__ = ("_names", "_name_offsets", "_keys", "_key_offsets", "_verbatim", "_generators")
+
+    def __init__(self, keys: dict):
+        names = bytearray()
+        name_offsets = array("I", [0])
+        raw_keys = bytearray()
+        key_offsets = array("I", [0])
+        verbatim = bytearray()
+        for name, secret in keys.items():
+            names += name.encode("utf-8")
+            name_offsets.append(len(names))
+            raw = _decode_secret(secret)
+            if raw is None:
+                raw_keys += secret.encode("utf-8")
+                verbatim.append(1)
+            else:
+                raw_keys += raw
+                verbatim.append(0)
+            key_offsets.append(len(raw_keys))
+        self._names = bytes(names)
+        self._name_offsets = name_offsets
+        self._keys = bytes(raw_keys)
+        self._key_offsets = key_offsets
+        self._verbatim = bytes(verbatim)
+        self._generators: dict = {}
+
+    def __len__(self) -> int:
+        return len(self._verbatim)
+
+    def name(self, index: int) -> str:
+        return self._names[self._name_offsets[index]:self._name_offsets[index + 1]].decode("utf-8")
+
+    def secret(self, index: int) -> str:
+        data = self._keys[self._key_offsets[index]:self._key_offsets[index + 1]]
+        if self._verbatim[index]:
+            return data.decode("utf-8")
+        return base64.b32encode(data).decode("ascii").rstrip("=")
+
+    def items(self):
+        """Yield ``(name, secret)`` pairs in vault order."""
+        for i in range(len(self)):
+            yield self.name(i), self.secret(i)
+
+    def generator(self, index: int) -> TOTPGenerator:
+        gen = self._generators.get(index)
+        if gen is None:
+            gen = self._generators[index] = TOTPGenerator(self.secret(index))
+        return gen
+
+    def window(self, indices):
+        """Return ``(index, generator)`` pairs for the given row indices.
+
+        Generators for any other rows are released, so only the rows that
+        are currently shown keep one alive.
+        """
+        rows = [(i, self.generator(i)) for i in indices]
+        self._generators = dict(rows)
+        return rows
+
+
+def _decode_secret(secret: str):
+    """Return the key bytes of a canonical (uppercase, unpadded) base32 secret, else None."""
+    try:
+        raw = base64.b32decode(secret + "=" * (-len(secret) % 8))
+    except (ValueError, TypeError):
+        return None
+    if base64.b32encode(raw).decode("ascii").rstrip("=") != secret:
+        return None
+    return raw
+
+
+def parse_secret(text: str):
+    """Return ``(label, totp)`` for a base32 secret or an ``otpauth://`` URI.
+
+    Plain secrets have no label. Errors in the secret itself only surface
+    when a code is generated.
+    """
+    if text.startswith("otpauth://"):
+        otp = pyotp.parse_uri(text)
+        if not isinstance(otp, pyotp.TOTP):
+            raise ValueError("not a TOTP URI (must start with otpauth://totp/)")
+        return otp.name, otp
+    return None, pyotp.TOTP(text.replace(" ", "").upper())
+
+
+def iter_line_batches(stream, batch_size: int = 1000, chunk_size: int = 65536):
+    """Yield lists of decoded lines from a binary stream as they arrive.
+
+    Each read returns whatever is already available (``read1``), and the
+    complete lines it produced are handed on right away, so a slow producer
+    still gets its codes promptly. Batches never exceed ``batch_size``.
+    """
+    read = getattr(stream, "read1", stream.read)
+    pending = b""
+    while True:
+        chunk = read(chunk_size)
+        if not chunk:
+            break
+        *lines, pending = (pending + chunk).split(b"\n")
+        for i in range(0, len(lines), batch_size):
+            yield [line.decode("utf-8", "replace") for line in lines[i:i + batch_size]]
+    if pending:
+        yield [pending.decode("utf-8", "replace")]
+
+
+def iter_code_batches(batches):
+    """Turn batches of secret/URI lines into lists of result dicts.
+
+    Every code in a batch is computed for the same timestamp, taken when the
+    batch arrives, so arbitrarily long inputs are processed at constant
+    memory. There is one result per input line, carrying its 1-based
+    ``line`` number and either ``code``/``remaining``, ``error``, or
+    nothing else for a blank line.
+    """
+    line_no = 0
+    for batch in batches:
+        now = time.time()
+        results = []
+        for line in batch:
+            line_no += 1
+            text = line.strip()
+            if not text:
+                results.append({"line": line_no})
+                continue
+            try:
+                label, otp = parse_secret(text)
+                code = otp.at(now)
+            except Exception as e:
+                results.append({"line": line_no, "error": str(e) or type(e).__name__})
+                continue
+            result = {"line": line_no, "code": code, "remaining": otp.interval - int(now) % otp.interval}
+            if label:
+                result["label"] = label
+            results.append(result)
+        yield results
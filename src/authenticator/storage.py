@@ -1,9 +1,14 @@
 import json 
+import os
 from pathlib import Path
 
 class Storage:
     def __init__(self):
         self.file_path = Path.home() / ".authenticator_keys.json"
+        # A "<mtime_ns> <size>" header for the vault it was built from, then
+        # one account name per line, so shell completion can list names
+        # without parsing the whole JSON file.
+        self.index_path = self.file_path.with_name(".authenticator_keys.names")
     
     def load(self):
         if not self.file_path.exists():
@@ -14,6 +19,24 @@ class Storage:
     def save(self, data):
         with open(self.file_path, "w", encoding="utf-8") as f:
             json.dump(data, f, indent=2, ensure_ascii=False)
+        self._write_index(data)
+
+    @staticmethod
+    def _indexable(name):
+        # Names that splitlines() would break apart are left out of the index
+        return name.splitlines() == [name]
+
+    def _vault_stamp(self):
+        stat = self.file_path.stat()
+        return f"{stat.st_mtime_ns} {stat.st_size}"
+
+    def _write_index(self, data):
+        names = [name for name in data if self._indexable(name)]
+        tmp = self.index_path.with_name(self.index_path.name + ".tmp")
+        with open(tmp, "w", encoding="utf-8", newline="\n") as f:
+            f.write(self._vault_stamp() + "\n" + "\n".join(names))
+        os.replace(tmp, self.index_path)
+
     def add(self, name, secret):
         data = self.load()
         data[name] = secret
@@ -37,5 +60,29 @@ class Storage:
     
     def list_keys(self):
         return self.load()
-    
 
+    def load_table(self):
+        """Load the vault as a compact AccountTable, in vault order."""
+        from authenticator.core import AccountTable
+
+        return AccountTable(self.load())
+
+    def list_names(self):
+        """Return stored account names, preferring the lightweight index."""
+        if not self.file_path.exists():
+            return []
+        try:
+            with open(self.index_path, "r", encoding="utf-8", newline="\n") as f:
+                header, _, body = f.read().partition("\n")
+            if header == self._vault_stamp():
+                return [name for name in body.split("\n") if name]
+        except OSError:
+            pass
+        # Index is missing or was built from another version of the vault
+        # (e.g. edited by hand); rebuild it.
+        data = self.load()
+        try:
+            self._write_index(data)
+        except OSError:
+            pass
+        return [name for name in data if self._indexable(name)]
@@ -1,13 +1,15 @@
 from __future__ import annotations
 
+from array import array
+
 import pyperclip
 from rich.text import Text
 from textual.app import App, ComposeResult
+from textual.binding import Binding
 from textual.containers import Vertical
 from textual.widgets import DataTable, Footer, Header, Static
-from textual.coordinate import Coordinate
 
-from authenticator.core import TOTPGenerator
+from authenticator.core import AccountTable
 from authenticator.storage import Storage
 
 
@@ -47,20 +49,29 @@ class Panel(App):
         ("escape", "quit", "Quit"),
         ("c", "copy_password", "Copy Code"),
         ("enter", "copy_password", "Copy Code"),
+        Binding("pagedown", "next_page", "Next Page", priority=True),
+        Binding("pageup", "prev_page", "Prev Page", priority=True),
     ]
 
     def __init__(self) -> None:
         super().__init__()
         self._storage = Storage()
-        self._keys: dict[str, str] = {}
-        self._generators: dict[str, TOTPGenerator] = {}
+        self._accounts = AccountTable({})
+        # Account indices sorted by name; pages are slices of this.
+        self._order = array("I")
+        # (st_mtime_ns, st_size) of the vault when it was last loaded, or
+        # "missing"; None forces the first refresh to load it.
+        self._vault_stamp: tuple[int, int] | str | None = None
+        # The DataTable only ever holds one page of accounts, starting here.
+        self._offset = 0
+        self._page_size = 0
 
     def compose(self) -> ComposeResult:
         yield Header(show_clock=True)
         with Vertical(id="main"):
             yield Static("Authenticator Dashboard", id="title")
             yield DataTable(id="table", cursor_type="row")
-            yield Static("Press 'c' or 'Enter' to copy • 'q' to quit", id="hint")
+            yield Static("Press 'c' or 'Enter' to copy • 'PgUp'/'PgDn' to change page • 'q' to quit", id="hint")
         yield Footer()
 
     def on_mount(self) -> None:
@@ -71,15 +82,51 @@ class Panel(App):
         table.add_column("VALID", key="valid")
         table.add_column("RING", key="ring")
         table.zebra_stripes = True
-        self._reload_keys()
-        self.refresh_table()
+        # Wait for the first layout so the page can be sized to the table.
+        self.call_after_refresh(self.refresh_table)
         self.set_interval(1, self.refresh_table)
 
-    def _reload_keys(self) -> None:
-        self._keys = self._storage.list_keys()
-        self._generators = {
-            name: TOTPGenerator(secret) for name, secret in self._keys.items()
-        }
+    def on_resize(self) -> None:
+        self.call_after_refresh(self.refresh_table)
+
+    def _reload_keys(self) -> bool:
+        """Rebuild the account table if the vault changed on disk."""
+        try:
+            stat = self._storage.file_path.stat()
+            stamp = (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            stamp = "missing"
+        if stamp == self._vault_stamp:
+            return False
+        self._vault_stamp = stamp
+        self._accounts = self._storage.load_table()
+        self._order = array("I", sorted(range(len(self._accounts)), key=self._accounts.name))
+        return True
+
+    def _fit_page(self, table: DataTable) -> int:
+        # One line of the table goes to the column header
+        height = table.size.height - 1
+        if height < 1:
+            height = self.size.height
+        return max(height, 1)
+
+    def _show_page(self, table: DataTable) -> None:
+        """Fill the DataTable with the current page of accounts only."""
+        self._page_size = self._fit_page(table)
+        self._offset = max(0, min(self._offset, len(self._accounts) - 1))
+        self._offset -= self._offset % self._page_size
+        table.clear()
+
+        if not self._accounts:
+            self.sub_title = ""
+            table.add_row("No stored secrets", "-", "-", "-")
+            return
+
+        page = self._order[self._offset:self._offset + self._page_size]
+        for index in page:
+            name = self._accounts.name(index)
+            table.add_row(name, "", "", "", key=name)
+        self.sub_title = f"{self._offset + 1}-{self._offset + len(page)} of {len(self._accounts)}"
 
     @staticmethod
     def _ring(remaining: int, period: int = 30) -> str:
@@ -91,54 +138,46 @@ class Panel(App):
 
     def refresh_table(self) -> None:
         table = self.query_one(DataTable)
-        latest_keys = self._storage.list_keys()
-        
-        # If keys changed (added/removed), reload and clear table structure
-        if latest_keys != self._keys:
-            self._reload_keys()
-            table.clear() 
-
-        if not self._keys:
-            if table.row_count == 0:
-                table.add_row("No stored secrets", "-", "-", "-")
-            return
 
-        for name in sorted(self._generators.keys()):
-            gen = self._generators[name]
-            code = gen.now()
-            remaining = gen.remaining()
+        # Rebuild the rows if the vault changed or the page no longer fits
+        if self._reload_keys() or self._page_size != self._fit_page(table):
+            self._show_page(table)
 
-            if remaining <= 5:
-                color = "red"
-            elif remaining <= 10:
-                color = "yellow"
-            else:
-                color = "green"
+        if not self._accounts:
+            return
 
-            code_text = Text(code, style=f"bold {color}")
-            remaining_text = Text(f"{remaining:2d}s", style=color)
-            ring_text = Text(self._ring(remaining), style=color)
+        rows = self._accounts.window(self._order[self._offset:self._offset + self._page_size])
+        if not rows:
+            return
 
-            row_key = name
-            
-            try:
-                # Try to get the row to see if it exists
-                # Using get_row_index is one way to check existence without iterating
-                _ = table.get_row_index(row_key)
-                
-                # If we get here, the row exists, so update cells
-                table.update_cell(row_key, "code", code_text)
-                table.update_cell(row_key, "valid", remaining_text)
-                table.update_cell(row_key, "ring", ring_text)
-            except Exception:
-                # Row likely doesn't exist, or API is different. 
-                # Try to add it.
-                try:
-                    table.add_row(name, code_text, remaining_text, ring_text, key=row_key)
-                except Exception:
-                    # If add fails (e.g. duplicate key but get_row_index failed for some reason), 
-                    # we can try to force update or just ignore.
-                    pass
+        remaining = rows[0][1].remaining()
+        if remaining <= 5:
+            color = "red"
+        elif remaining <= 10:
+            color = "yellow"
+        else:
+            color = "green"
+
+        remaining_text = Text(f"{remaining:2d}s", style=color)
+        ring_text = Text(self._ring(remaining), style=color)
+
+        for index, gen in rows:
+            row_key = self._accounts.name(index)
+            table.update_cell(row_key, "code", Text(gen.now(), style=f"bold {color}"))
+            table.update_cell(row_key, "valid", remaining_text)
+            table.update_cell(row_key, "ring", ring_text)
+
+    def action_next_page(self) -> None:
+        if self._offset + self._page_size < len(self._accounts):
+            self._offset += self._page_size
+            self._show_page(self.query_one(DataTable))
+            self.refresh_table()
+
+    def action_prev_page(self) -> None:
+        if self._offset > 0:
+            self._offset -= self._page_size
+            self._show_page(self.query_one(DataTable))
+            self.refresh_table()
 
     def action_copy_password(self) -> None:
         table = self.query_one(DataTable)
@@ -149,9 +188,11 @@ class Panel(App):
             if row_index is None:
                 return
 
-            # Get content from the "code" column (index 1)
-            val = table.get_cell_at(Coordinate(row_index, 1))
-            code_str = str(val)
+            position = self._offset + row_index
+            if position >= len(self._order):
+                return
+
+            code_str = self._accounts.generator(self._order[position]).now()
             
             pyperclip.copy(code_str)
             self.notify(f"Copied {code_str} to clipboard!", title="Success", timeout=2)